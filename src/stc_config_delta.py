@@ -0,0 +1,216 @@
+"""
+Read and apply incremental configuration changes (delta) to the live STC project.
+
+Delta file (JSON):
+    {
+        "base": "test_config.xml",
+        "delete": ["port:Port 1/streamblock:Old SB"],
+        "create": [{"type": "streamblock", "under": "port:Port 1", "attributes": {"Name": "New SB"}}],
+        "modify": [{"object": "port:Port 1/streamblock:Bound SB", "attributes": {"FixedFrameLength": "256"}}]
+    }
+
+Delta file (XML):
+    <delta base="test_config.xml">
+        <delete object="port:Port 1/streamblock:Old SB" />
+        <create type="streamblock" under="port:Port 1" Name="New SB" />
+        <modify object="port:Port 1/streamblock:Bound SB" FixedFrameLength="256" />
+    </delta>
+
+Object paths are relative to the project, each path element is either <type>:<name> or STC object handle (e.g.
+streamblock1). Empty path is the project itself. base is optional, if set it must match the name of the loaded
+configuration file. The project and ports can not be deleted, however they are addressed.
+
+With multiple controllers each path must resolve on exactly one controller. Object handles and the project path exist
+on all controllers so they can be used only with a single controller.
+
+Operations are applied in the order delete, create, modify. Objects deleted by the delta, or under deleted objects,
+can not be deleted again, created under or modified by the same delta, whether addressed by path or by handle. All
+paths are resolved and checked before any change is made so a delta with a bad path does not change the configuration.
+"""
+import json
+import re
+from collections import OrderedDict
+from os import path
+from typing import List, Optional, Set
+from xml.etree import ElementTree
+
+from testcenter.stc_app import StcApp
+from testcenter.stc_object import extract_stc_obj_type_from_obj_ref
+from trafficgenerator.tgn_utils import TgnError
+
+# Ports are mapped and reserved by load_config and can not be created or deleted by delta.
+PORT_TYPE = "port"
+PROJECT_TYPE = "project"
+
+# Cached testcenter objects that might be created or deleted by delta and must be re-read after delta is applied.
+REFRESHED_TYPES = ("streamblock", "emulateddevice")
+
+
+def read_config_delta(delta_file_name: str) -> dict:
+    """Read delta file, JSON or XML, into normalized delta dictionary.
+
+    Delta file type is extracted from the file suffix - json or xml.
+
+    :param delta_file_name: full path to the delta file.
+    """
+    ext = path.splitext(delta_file_name)[-1].lower()
+    if ext == ".json":
+        with open(delta_file_name, "r", encoding="utf-8") as delta_file:
+            delta = json.load(delta_file)
+    elif ext == ".xml":
+        delta = _read_xml_delta(delta_file_name)
+    else:
+        raise TgnError(f"Delta file type {ext} not supported - use json or xml")
+    return {
+        "base": delta.get("base", ""),
+        "delete": list(delta.get("delete", [])),
+        "create": [
+            {"type": create["type"], "under": create.get("under", ""), "attributes": create.get("attributes", {})}
+            for create in delta.get("create", [])
+        ],
+        "modify": [{"object": modify["object"], "attributes": modify["attributes"]} for modify in delta.get("modify", [])],
+    }
+
+
+def resolve_delta(stc: StcApp, delta: dict) -> dict:
+    """Resolve all delta object paths to object handles in the project of the requested StcApp.
+
+    validate_delta checks the paths, here the resolved handles are checked so objects addressed by handle are covered too.
+
+    :return: {path: handle} for all paths that exist in the project.
+    :raises TgnError: if delta deletes the project or a port, or operates on an object it already deleted.
+    """
+    handles = OrderedDict()
+    for object_path in delta_paths(delta):
+        handle = resolve_path(stc, object_path)
+        if handle:
+            handles[object_path] = handle
+    for object_path in delta["delete"]:
+        if object_path in handles and extract_stc_obj_type_from_obj_ref(handles[object_path]) in (PROJECT_TYPE, PORT_TYPE):
+            raise TgnError(f'Delta can not delete project or port "{object_path}", use load_config')
+    deleted_handles: Set[str] = set()
+    for index, object_path in enumerate(delta_paths(delta)):
+        if object_path not in handles:
+            continue
+        if deleted_handles and deleted_handles & set(_ancestors(stc, handles[object_path])):
+            raise TgnError(f'Delta object "{object_path}" is already deleted by the same delta')
+        if index < len(delta["delete"]):
+            deleted_handles.add(handles[object_path])
+    return handles
+
+
+def apply_config_delta(stc: StcApp, delta: dict, handles: dict) -> int:
+    """Apply all delta operations whose paths were resolved in the project of the requested StcApp.
+
+    :param handles: resolved object handles as returned by resolve_delta.
+    :return: number of operations applied.
+    """
+    operations = 0
+    for object_path in delta["delete"]:
+        if object_path in handles:
+            stc.api.delete(handles[object_path])
+            operations += 1
+    for create in delta["create"]:
+        if create["under"] in handles:
+            stc.api.client.create(create["type"], under=handles[create["under"]], **create["attributes"])
+            operations += 1
+    for modify in delta["modify"]:
+        if modify["object"] in handles:
+            stc.api.config(handles[modify["object"]], **modify["attributes"])
+            operations += 1
+    if operations:
+        stc.api.apply()
+        for port in stc.project.get_ports().values():
+            for obj_type in REFRESHED_TYPES:
+                port.del_objects_by_type(obj_type)
+        for obj_type in REFRESHED_TYPES:
+            stc.project.del_objects_by_type(obj_type)
+    return operations
+
+
+def delta_paths(delta: dict) -> List[str]:
+    """Return all object paths referenced by delta."""
+    return delta["delete"] + [create["under"] for create in delta["create"]] + [modify["object"] for modify in delta["modify"]]
+
+
+def validate_delta(delta: dict) -> None:
+    """Validate that delta does not create or delete ports and does not delete, create under or modify deleted objects."""
+    for object_path in delta["delete"]:
+        elements = _path_elements(object_path)
+        if not elements or elements[-1][0] == PORT_TYPE:
+            raise TgnError(f'Delta can not delete project or port "{object_path}", use load_config')
+    for create in delta["create"]:
+        if create["type"].lower() == PORT_TYPE:
+            raise TgnError("Delta can not create ports, use load_config")
+    deleted_elements: List[list] = []
+    for index, object_path in enumerate(delta_paths(delta)):
+        elements = _path_elements(object_path)
+        if any(elements[: len(deleted)] == deleted for deleted in deleted_elements):
+            raise TgnError(f'Delta object "{object_path}" is already deleted by the same delta')
+        if index < len(delta["delete"]):
+            deleted_elements.append(elements)
+
+
+def resolve_path(stc: StcApp, object_path: str) -> Optional[str]:
+    """Return object handle of the requested object path or None if the path does not exist in the project."""
+    handle = stc.project.ref
+    for obj_type, name in _path_elements(object_path):
+        if not obj_type:
+            try:
+                stc.api.get(name, "Name")
+            except Exception:  # pylint: disable=broad-except
+                return None
+            handle = name
+            continue
+        for child in stc.api.get(handle, f"children-{obj_type}").split():
+            if re.sub(r" \(offline\)$", "", stc.api.get(child, "Name")) == name:
+                handle = child
+                break
+        else:
+            return None
+    return handle
+
+
+#
+# Private functions.
+#
+
+
+def _path_elements(object_path: str) -> List[tuple]:
+    """Split object path into list of (type, name) elements, type is empty for object handle elements."""
+    elements = []
+    for element in [e for e in object_path.split("/") if e]:
+        obj_type, _, name = element.partition(":") if ":" in element else ("", "", element)
+        elements.append((obj_type.lower(), name))
+    return elements
+
+
+def _ancestors(stc: StcApp, handle: str) -> List[str]:
+    """Return the requested handle followed by the handles of all its parents up to the project."""
+    ancestors = [handle]
+    while handle != stc.project.ref:
+        handle = stc.api.get(handle, "parent")
+        if not handle:
+            break
+        ancestors.append(handle)
+    return ancestors
+
+
+def _read_xml_delta(delta_file_name: str) -> dict:
+    """Read XML delta file into delta dictionary."""
+    root = ElementTree.parse(delta_file_name).getroot()
+    delta: dict = {"base": root.get("base", ""), "delete": [], "create": [], "modify": []}
+    for element in root:
+        attributes = dict(element.attrib)
+        if element.tag == "delete":
+            delta["delete"].append(attributes["object"])
+        elif element.tag == "create":
+            obj_type = attributes.pop("type")
+            under = attributes.pop("under", "")
+            delta["create"].append({"type": obj_type, "under": under, "attributes": attributes})
+        elif element.tag == "modify":
+            object_path = attributes.pop("object")
+            delta["modify"].append({"object": object_path, "attributes": attributes})
+        else:
+            raise TgnError(f"Unknown delta operation {element.tag} - use delete, create or modify")
+    return delta
@@ -2,12 +2,26 @@
 STC controller shell driver API. The business logic is implemented in stc_handler.py.
 """
 # pylint: disable=unused-argument
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 from cloudshell.shell.core.driver_context import CancellationContext, InitCommandContext, ResourceCommandContext
 from cloudshell.traffic.tg import TgControllerDriver, enqueue_keep_alive
+from trafficgenerator.tgn_utils import TgnError
 
 from stc_handler import StcHandler
+from stc_profiler import profile_command
+
+PROFILED_COMMANDS = [
+    "load_config",
+    "apply_config_delta",
+    "send_arp",
+    "start_protocols",
+    "stop_protocols",
+    "start_traffic",
+    "stop_traffic",
+    "get_statistics",
+    "run_quick_test",
+]
 
 
 class StcControllerShell2GDriver(TgControllerDriver):
@@ -17,6 +31,7 @@ class StcControllerShell2GDriver(TgControllerDriver):
         """Initialize object variables, actual initialization is performed in initialize method."""
         super().__init__()
         self.handler = StcHandler()
+        self.profiled_commands: List[str] = []
 
     def initialize(self, context: InitCommandContext) -> None:
         """Initialize IxNetwork controller shell (from API)."""
@@ -28,49 +43,95 @@ class StcControllerShell2GDriver(TgControllerDriver):
         self.handler.cleanup()
         super().cleanup()
 
-    def load_config(self, context: ResourceCommandContext, config_file_location: str) -> None:
-        """Load STC configuration file, map and reserve ports."""
+    def load_config(
+        self, context: ResourceCommandContext, config_file_location: str, link_up_timeout: Optional[str] = "0"
+    ) -> None:
+        """Load STC configuration file, map and reserve ports.
+
+        :param config_file_location: full path to the configuration file. When the service controls multiple
+            controllers - comma separated list of configuration files, one per controller.
+        :param link_up_timeout: if > 0, wait up to link_up_timeout seconds for all reserved ports to come up.
+        """
+        with profile_command(context, self.logger, "load_config", self.profiled_commands):
+            enqueue_keep_alive(context)
+            self.handler.load_config(context, config_file_location, _link_up_timeout(link_up_timeout))
+
+    def load_config_async(
+        self, context: ResourceCommandContext, config_file_location: str, link_up_timeout: Optional[str] = "0"
+    ) -> str:
+        """Start loading STC configuration file, mapping and reserving ports, in the background and return immediately.
+
+        :param config_file_location: full path to the configuration file. When the service controls multiple
+            controllers - comma separated list of configuration files, one per controller.
+        :param link_up_timeout: if > 0, wait up to link_up_timeout seconds for all reserved ports to come up.
+        :return: job ID to pass to get_load_config_progress.
+        """
         enqueue_keep_alive(context)
-        self.handler.load_config(context, config_file_location)
+        return self.handler.load_config_async(context, config_file_location, _link_up_timeout(link_up_timeout))
+
+    def get_load_config_progress(self, context: ResourceCommandContext, job_id: str) -> dict:
+        """Return the progress of load configuration job.
+
+        :param job_id: job ID returned by load_config_async.
+        :return: job state (running/completed/failed), config loaded, number of reserved and up ports out of total
+            ports, link state of each reserved port and error message if the job failed.
+        """
+        return self.handler.get_load_config_progress(job_id)
+
+    def apply_config_delta(self, context: ResourceCommandContext, delta_file_location: str) -> str:
+        """Apply configuration changes to the loaded configuration without reloading it or re-reserving ports.
+
+        :param delta_file_location: full path to the delta file (json or xml) with objects to delete, create and modify.
+        """
+        with profile_command(context, self.logger, "apply_config_delta", self.profiled_commands):
+            return self.handler.apply_config_delta(delta_file_location)
 
     def send_arp(self, context: ResourceCommandContext) -> None:
         """Send ARP/ND for all devices and streams."""
-        self.handler.send_arp()
+        with profile_command(context, self.logger, "send_arp", self.profiled_commands):
+            self.handler.send_arp()
 
     def start_protocols(self, context: ResourceCommandContext) -> None:
         """Start all emulations on all devices."""
-        self.handler.start_devices()
+        with profile_command(context, self.logger, "start_protocols", self.profiled_commands):
+            self.handler.start_devices()
 
     def stop_protocols(self, context: ResourceCommandContext) -> None:
         """Stop all emulations on all devices."""
-        self.handler.stop_devices()
+        with profile_command(context, self.logger, "stop_protocols", self.profiled_commands):
+            self.handler.stop_devices()
 
     def start_traffic(self, context: ResourceCommandContext, blocking: str) -> str:
         """Start traffic on all ports.
 
         :param blocking: True - return after traffic finish to run, False - return immediately.
         """
-        self.handler.start_traffic(blocking)
-        return f"traffic started in {blocking} mode"
+        with profile_command(context, self.logger, "start_traffic", self.profiled_commands):
+            self.handler.start_traffic(blocking)
+            return f"traffic started in {blocking} mode"
 
     def stop_traffic(self, context: ResourceCommandContext) -> None:
         """Stop traffic on all ports."""
-        self.handler.stop_traffic()
+        with profile_command(context, self.logger, "stop_traffic", self.profiled_commands):
+            self.handler.stop_traffic()
 
     def get_statistics(self, context: ResourceCommandContext, view_name: str, output_type: str) -> Union[dict, str]:
         """Get view statistics.
 
         :param view_name: generatorPortResults, analyzerPortResults etc.
-        :param output_type: CSV or JSON.
+        :param output_type: CSV, JSON, CSV.GZ (gzip compressed CSV) or COLUMNAR (Arrow IPC if pyarrow is installed, else
+            built-in columnar format). Binary output types are returned base64 encoded.
         """
-        return self.handler.get_statistics(context, view_name, output_type)
+        with profile_command(context, self.logger, "get_statistics", self.profiled_commands):
+            return self.handler.get_statistics(context, view_name, output_type)
 
     def run_quick_test(self, context: ResourceCommandContext, command: str) -> None:
         """Run sequencer command.
 
         :param command: from GUI - Start/Stop/Wait, from API also available Step/Pause.
         """
-        self.handler.sequencer_command(command)
+        with profile_command(context, self.logger, "run_quick_test", self.profiled_commands):
+            self.handler.sequencer_command(command)
 
     def keep_alive(self, context: ResourceCommandContext, cancellation_context: CancellationContext) -> None:
         """Keep TestCenter controller shell sessions alive (from TG controller API).
@@ -83,6 +144,23 @@ class StcControllerShell2GDriver(TgControllerDriver):
     # Hidden commands for developers only.
     #
 
+    def set_profiling(self, context: ResourceCommandContext, commands: Optional[str] = "") -> List[str]:
+        """Set the commands to profile. Profiles of each run of a profiled command are attached to the sandbox.
+
+        :param commands: comma separated list of command names (e.g. load_config,get_statistics), all - profile all
+            commands, empty - stop profiling.
+        :return: list of profiled commands.
+        """
+        requested_commands = [command.strip() for command in commands.split(",") if command.strip()]
+        if requested_commands == ["all"]:
+            requested_commands = PROFILED_COMMANDS
+        for command in requested_commands:
+            if command not in PROFILED_COMMANDS:
+                raise TgnError(f'Command "{command}" can not be profiled, use one of {PROFILED_COMMANDS}')
+        self.profiled_commands = requested_commands
+        self.logger.info(f"profiled commands = {self.profiled_commands}")
+        return self.profiled_commands
+
     def get_session_id(self, context: ResourceCommandContext) -> str:
         """Return the REST session ID."""
         self.logger.info("getting session ID")
@@ -123,3 +201,11 @@ class StcControllerShell2GDriver(TgControllerDriver):
         :param parameters_json: parameters dict {name: value} as serialized json.
         """
         return self.handler.perform_command(command, parameters_json)
+
+
+def _link_up_timeout(link_up_timeout: Optional[str]) -> int:
+    """Return link up timeout command input as number of seconds, empty input means no wait."""
+    link_up_timeout = (link_up_timeout or "").strip() or "0"
+    if not link_up_timeout.isdecimal():
+        raise TgnError(f'Link up timeout should be a whole number of seconds, 0 or more - got "{link_up_timeout}"')
+    return int(link_up_timeout)
@@ -1,24 +1,132 @@
 """
 STC controller shell business logic.
 """
-import csv
-import io
+import base64
+import functools
 import json
 import logging
-from collections import OrderedDict
-from typing import Union
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from typing import Any, Callable, Dict, List, Optional, Union
 
+from cloudshell.api.cloudshell_api import ReservedResourceInfo
 from cloudshell.shell.core.driver_context import InitCommandContext, ResourceCommandContext
 from cloudshell.traffic.helpers import get_family_attribute, get_location, get_resources_from_reservation
 from cloudshell.traffic.tg import STC_CHASSIS_MODEL, attach_stats_csv, is_blocking
 from testcenter.stc_app import StcApp, StcSequencerOperation, init_stc
+from testcenter.stc_object import StcObject
+from testcenter.stc_port import StcPort
 from testcenter.stc_statistics_view import StcStats
 from trafficgenerator.tgn_utils import ApiType, TgnError
 
+from stc_config_delta import apply_config_delta, delta_paths, read_config_delta, resolve_delta, validate_delta
 from stc_data_model import STC_Controller_Shell_2G
+from stc_statistics import stats_to_columnar, stats_to_csv, stats_to_csv_gz
 
 OFFLINE_PORT_MARKER = "offline-debug"
 
+LINK_UP_MIN_POLL_INTERVAL = 0.25
+LINK_UP_MAX_POLL_INTERVAL = 4
+LINK_UP_MAX_WORKERS = 16
+
+# testcenter keeps the active project as a class attribute (StcObject.project), operations that depend on it must pin it
+# to the session's project and run one controller at a time.
+project_lock = threading.Lock()
+
+
+class LoadConfigJob:
+    """Progress of load configuration job."""
+
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, wait_for_link_up: bool = False) -> None:
+        """Create new running job.
+
+        :param wait_for_link_up: True if the job waits for link up of the reserved ports, else ports_up is not reported.
+        """
+        self.job_id = uuid.uuid4().hex
+        self.wait_for_link_up = wait_for_link_up
+        self.state = self.RUNNING
+        self.config_loaded = False
+        self.ports: Dict[str, StcPort] = {}
+        self.reserved_ports: List[str] = []
+        self.ports_up: List[str] = []
+        self.error = ""
+
+    def progress(self) -> dict:
+        """Return job progress."""
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "config_loaded": self.config_loaded,
+            "ports_reserved": len(self.reserved_ports),
+            "ports_total": len(self.ports),
+            "ports_up": len(self.ports_up) if self.wait_for_link_up else None,
+            "error": self.error,
+        }
+
+
+class ProjectAccess:
+    """Non-blocking shared/exclusive access to the project(s).
+
+    Project commands share access so they can run together (e.g. stop traffic while blocking start traffic runs), load
+    configuration takes exclusive access as it replaces the project(s). Nobody waits - acquire returns False if the access
+    can not be granted immediately.
+    """
+
+    def __init__(self) -> None:
+        """Create free access."""
+        self._lock = threading.Lock()
+        self.shared = 0
+        self.exclusive = False
+
+    def acquire_shared(self) -> bool:
+        """Acquire shared access, return False if exclusive access is held."""
+        with self._lock:
+            if self.exclusive:
+                return False
+            self.shared += 1
+            return True
+
+    def release_shared(self) -> None:
+        """Release shared access."""
+        with self._lock:
+            self.shared -= 1
+
+    def acquire_exclusive(self) -> bool:
+        """Acquire exclusive access, return False if any access is held."""
+        with self._lock:
+            if self.exclusive or self.shared:
+                return False
+            self.exclusive = True
+            return True
+
+    def release_exclusive(self) -> None:
+        """Release exclusive access."""
+        with self._lock:
+            self.exclusive = False
+
+
+def project_command(method: Callable) -> Callable:
+    """Run StcHandler method with shared project access, fail immediately if load configuration is running."""
+
+    @functools.wraps(method)
+    def wrapper(self: "StcHandler", *args: Any, **kwargs: Any) -> Any:
+        if not self.project_access.acquire_shared():
+            self._raise_load_config_job_running()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.project_access.release_shared()
+
+    return wrapper
+
 
 class StcHandler:
     """STC controller shell business logic."""
@@ -26,112 +134,427 @@ class StcHandler:
     def __init__(self) -> None:
         """Initialize object variables, actual initialization is performed in initialize method."""
         self.stc: StcApp = None
+        self.stcs: Dict[str, StcApp] = OrderedDict()
+        self.load_config_job: Optional[LoadConfigJob] = None
+        self.project_access = ProjectAccess()
+        self.config_files: Dict[str, str] = {}
         self.logger: logging.Logger = None
 
     def initialize(self, context: InitCommandContext, logger: logging.Logger) -> None:
-        """Init StcApp and connect to STC REST server."""
+        """Init StcApp and connect to STC REST server(s).
+
+        The service Address may hold a comma separated list of controllers, each as address or address:port.
+        """
         self.logger = logger
 
         service = STC_Controller_Shell_2G.create_from_context(context)
 
-        controller = service.address
         port = service.controller_tcp_port if service.controller_tcp_port else "8888"
-        self.stc = init_stc(ApiType.rest, self.logger, rest_server=controller, rest_port=int(port))
-        self.stc.connect()
+        for controller in service.address.split(","):
+            controller_address, _, controller_port = controller.strip().partition(":")
+            stc = init_stc(ApiType.rest, self.logger, rest_server=controller_address, rest_port=int(controller_port or port))
+            self.stcs[f"{controller_address}:{controller_port or port}"] = stc
+        self.stc = list(self.stcs.values())[0]
+        self._run_on_controllers(lambda stc: stc.connect())
 
     def cleanup(self) -> None:
-        """Disconnect from STC REST server."""
-        self.stc.disconnect()
+        """Disconnect from STC REST server(s)."""
+        self._run_on_controllers(lambda stc: stc.disconnect())
 
-    def load_config(self, context: ResourceCommandContext, stc_config_file_name: str) -> None:
-        """Load STC configuration file, and map and reserve ports."""
-        self.stc.load_config(stc_config_file_name)
-        config_ports = self.stc.project.get_ports()
+    def load_config(self, context: ResourceCommandContext, stc_config_file_name: str, link_up_timeout: int = 0) -> None:
+        """Load STC configuration file, and map and reserve ports.
 
-        reservation_ports = {}
-        for port in get_resources_from_reservation(context, f"{STC_CHASSIS_MODEL}.GenericTrafficGeneratorPort"):
-            reservation_ports[get_family_attribute(context, port.Name, "Logical Name")] = port
+        With multiple controllers, stc_config_file_name is a comma separated list of configuration files, one per
+        controller in the same order as the controllers in the service Address. Each controller reserves the ports of
+        its own configuration.
 
-        for name, port in config_ports.items():
-            if name in reservation_ports:
-                address = get_location(reservation_ports[name])
-                self.logger.debug(f"Logical Port {name} will be reserved on Physical location {address}")
-                if OFFLINE_PORT_MARKER not in reservation_ports[name].Name:
-                    port.reserve(address, force=True, wait_for_up=False)
-                else:
-                    self.logger.debug(f"Offline debug port {address} - no actual reservation")
-            else:
-                raise TgnError(f'Configuration port "{port}" not found in reservation ports {reservation_ports.keys()}')
+        :param link_up_timeout: if > 0, wait up to link_up_timeout seconds for all reserved ports to come up.
+        """
+        job = self._start_load_config_job(link_up_timeout)
+        try:
+            config_files = self._get_config_files(stc_config_file_name)
+            reservation_ports = self._get_reservation_ports(context)
+            self._load_config(config_files, reservation_ports, job, link_up_timeout)
+        except Exception as error:
+            self._fail_load_config_job(job, error)
+            raise
+        finally:
+            self.project_access.release_exclusive()
 
-        self.logger.info("Port Reservation Completed")
+    def load_config_async(self, context: ResourceCommandContext, stc_config_file_name: str, link_up_timeout: int = 0) -> str:
+        """Start loading STC configuration file, and mapping and reserving ports, in the background.
 
+        :param link_up_timeout: if > 0, wait up to link_up_timeout seconds for all reserved ports to come up.
+        :return: job ID to pass to get_load_config_progress.
+        """
+        job = self._start_load_config_job(link_up_timeout)
+        try:
+            config_files = self._get_config_files(stc_config_file_name)
+            reservation_ports = self._get_reservation_ports(context)
+            threading.Thread(
+                target=self._run_load_config_job,
+                args=(config_files, reservation_ports, job, link_up_timeout),
+                name=f"LoadConfigJob-{job.job_id}",
+                daemon=True,
+            ).start()
+        except Exception as error:
+            self._fail_load_config_job(job, error)
+            self.project_access.release_exclusive()
+            raise
+        return job.job_id
+
+    def get_load_config_progress(self, job_id: str) -> dict:
+        """Return the progress of the requested load configuration job."""
+        if not self.load_config_job or self.load_config_job.job_id != job_id:
+            raise TgnError(f"Load configuration job {job_id} not found")
+        progress = self.load_config_job.progress()
+        progress["link_states"] = {
+            name: self._get_link_state(port)
+            for name, port in self.load_config_job.ports.items()
+            if name in self.load_config_job.reserved_ports
+        }
+        return progress
+
+    @project_command
+    def apply_config_delta(self, delta_file_name: str) -> str:
+        """Apply configuration changes from delta file to the loaded configuration, keeping port reservations.
+
+        With multiple controllers, each delta operation is applied on the controller whose configuration contains the
+        operation object path. Paths that exist on more than one controller, like the project path or raw object handles,
+        are rejected - address the objects by <type>:<name> path starting at a port.
+
+        :param delta_file_name: full path to the delta file, see stc_config_delta.py for the delta file format.
+        :return: number of applied changes.
+        """
+        if not self.config_files:
+            raise TgnError("No configuration loaded - load configuration before applying configuration delta")
+        delta = read_config_delta(delta_file_name)
+        validate_delta(delta)
+        config_names = [path.basename(config_file) for config_file in self.config_files.values()]
+        if delta["base"] and delta["base"] not in config_names:
+            raise TgnError(f'Delta base configuration "{delta["base"]}" is not loaded, loaded configurations {config_names}')
+
+        controllers_handles = self._run_on_controllers(lambda stc: resolve_delta(stc, delta))
+        path_controllers: Dict[str, str] = {}
+        for controller, handles in controllers_handles.items():
+            for object_path in handles:
+                if object_path in path_controllers:
+                    raise TgnError(
+                        f'Delta object "{object_path}" found on controllers {path_controllers[object_path]} and {controller}'
+                    )
+                path_controllers[object_path] = controller
+        missing_paths = [object_path for object_path in delta_paths(delta) if object_path not in path_controllers]
+        if missing_paths:
+            raise TgnError(f"Delta objects not found in loaded configuration {missing_paths}")
+
+        operations = self._run_on_controllers(
+            lambda stc: apply_config_delta(stc, delta, controllers_handles[self._controller_of(stc)])
+        )
+        self.logger.info(f"Configuration delta applied - {operations}")
+        return f"{sum(operations.values())} configuration changes applied"
+
+    @project_command
     def send_arp(self) -> None:
         """Send ARP/ND for all devices and streams."""
-        self.stc.send_arp_ns()
+        self._run_on_controllers(lambda stc: stc.send_arp_ns())
 
+    @project_command
     def start_devices(self) -> None:
         """Start all emulations on all devices."""
-        self.stc.start_devices()
+        self._run_on_controllers(lambda stc: stc.start_devices(), pin_project=True)
 
+    @project_command
     def stop_devices(self) -> None:
         """Stop all emulations on all devices."""
-        self.stc.stop_devices()
+        self._run_on_controllers(lambda stc: stc.stop_devices(), pin_project=True)
 
+    @project_command
     def start_traffic(self, blocking: str) -> None:
-        """Start traffic on all ports."""
-        self.stc.clear_results()
-        self.stc.start_traffic(is_blocking(blocking))
+        """Start traffic on all ports.
+
+        All controllers clear results first and then start traffic together to minimize the start skew between them.
+        """
+        barrier = threading.Barrier(len(self.stcs))
+
+        def start_traffic(stc: StcApp) -> None:
+            try:
+                stc.clear_results()
+            except Exception:
+                barrier.abort()
+                raise
+            barrier.wait()
+            stc.start_traffic(is_blocking(blocking))
 
+        self._run_on_controllers(start_traffic)
+
+    @project_command
     def stop_traffic(self) -> None:
         """Stop traffic on all ports."""
-        self.stc.stop_traffic()
+        self._run_on_controllers(lambda stc: stc.stop_traffic())
 
+    @project_command
     def get_statistics(self, context: ResourceCommandContext, view_name: str, output_type: str) -> Union[dict, str]:
         """Get statistics for the requested view."""
-        stats_obj = StcStats(view_name)
-        stats_obj.read_stats()
+
+        def read_stats(stc: StcApp) -> StcStats:
+            stats_obj = StcStats(view_name)
+            stats_obj.read_stats()
+            return stats_obj
+
+        controllers_stats = [
+            (controller, obj.name, obj_values)
+            for controller, stats_obj in self._run_on_controllers(read_stats, pin_project=True).items()
+            for obj, obj_values in stats_obj.statistics.items()
+        ]
+        names_count = Counter(name for _, name, _ in controllers_stats)
         statistics = OrderedDict()
-        for obj, obj_values in stats_obj.statistics.items():
-            statistics[obj.name] = obj_values
+        for controller, name, obj_values in controllers_stats:
+            statistics[name if names_count[name] == 1 else f"{controller}/{name}"] = obj_values
 
-        if output_type.strip().lower() == "json":
+        output_type = output_type.strip().lower()
+        if output_type == "json":
             statistics_str = json.dumps(statistics, indent=4, sort_keys=True, ensure_ascii=False)
             return json.loads(statistics_str)
-        if output_type.strip().lower() == "csv":
-            captions = list(list(statistics.values())[0].keys())
-            output = io.StringIO()
-            writer = csv.DictWriter(output, captions)
-            writer.writeheader()
-            for obj_values in statistics.values():
-                writer.writerow(obj_values)
-            attach_stats_csv(context, self.logger, view_name, output.getvalue().strip())
-            return output.getvalue().strip()
-        raise TgnError(f'Output type should be CSV/JSON - got "{output_type}"')
+        if output_type == "csv":
+            output = stats_to_csv(statistics)
+            attach_stats_csv(context, self.logger, view_name, output)
+            return output
+        if output_type == "csv.gz":
+            output_bytes = stats_to_csv_gz(statistics)
+            attach_stats_csv(context, self.logger, view_name, output_bytes, suffix="csv.gz")  # type: ignore[arg-type]
+            return base64.b64encode(output_bytes).decode("ascii")
+        if output_type == "columnar":
+            output_bytes, suffix = stats_to_columnar(statistics)
+            attach_stats_csv(context, self.logger, view_name, output_bytes, suffix=suffix)  # type: ignore[arg-type]
+            return base64.b64encode(output_bytes).decode("ascii")
+        raise TgnError(f'Output type should be CSV/JSON/CSV.GZ/COLUMNAR - got "{output_type}"')
 
+    @project_command
     def sequencer_command(self, command: str) -> None:
         """Run sequencer command."""
-        if StcSequencerOperation[command.lower()] == StcSequencerOperation.start:
-            self.stc.clear_results()
-        self.stc.sequencer_command(StcSequencerOperation[command.lower()])
+
+        def sequencer_command(stc: StcApp) -> None:
+            if StcSequencerOperation[command.lower()] == StcSequencerOperation.start:
+                stc.clear_results()
+            stc.sequencer_command(StcSequencerOperation[command.lower()])
+
+        self._run_on_controllers(sequencer_command)
+
+    #
+    # Hidden commands operate on the first controller only.
+    #
 
     def get_session_id(self) -> str:
         """Return the REST session ID."""
         self.logger.info(f"session_id = {self.stc.api.session_id}")
         return self.stc.api.session_id
 
+    @project_command
     def get_children(self, obj_ref: str, child_type: str) -> list:
         """Return all children, of the requested type, of the requested object."""
         children_attribute = "children-" + child_type if child_type else "children"
         return self.stc.api.client.get(obj_ref, children_attribute).split()
 
+    @project_command
     def get_attributes(self, obj_ref: str) -> dict:
         """Return all attributes of the requested object."""
         return self.stc.api.client.get(obj_ref)
 
+    @project_command
     def set_attribute(self, obj_ref: str, attr_name: str, attr_value: str) -> None:
         """Set object attribute."""
         self.stc.api.client.config(obj_ref, **{attr_name: attr_value})
 
+    @project_command
     def perform_command(self, command: str, parameters_json: str) -> str:
         """Perform STC command."""
         return self.stc.api.client.perform(command, json.loads(parameters_json))
+
+    #
+    # Private methods.
+    #
+
+    def _get_config_files(self, stc_config_file_name: str) -> Dict[str, str]:
+        """Return configuration file per controller."""
+        if len(self.stcs) == 1:
+            return {list(self.stcs)[0]: stc_config_file_name}
+        file_names = [file_name.strip() for file_name in stc_config_file_name.split(",")]
+        if len(file_names) != len(self.stcs):
+            raise TgnError(f"Expected {len(self.stcs)} configuration files, one per controller - got {len(file_names)}")
+        return dict(zip(self.stcs, file_names))
+
+    @staticmethod
+    def _get_reservation_ports(context: ResourceCommandContext) -> Dict[str, ReservedResourceInfo]:
+        """Return all reservation ports by their logical name."""
+        reservation_ports = {}
+        for port in get_resources_from_reservation(context, f"{STC_CHASSIS_MODEL}.GenericTrafficGeneratorPort"):
+            reservation_ports[get_family_attribute(context, port.Name, "Logical Name")] = port
+        return reservation_ports
+
+    def _load_config(
+        self,
+        config_files: Dict[str, str],
+        reservation_ports: Dict[str, ReservedResourceInfo],
+        job: LoadConfigJob,
+        link_up_timeout: int,
+    ) -> None:
+        """Load configuration files, and map and reserve ports, while reporting progress to the job."""
+        self.config_files = {}
+        self._run_on_controllers(lambda stc: stc.load_config(config_files[self._controller_of(stc)]))
+        controllers_ports = self._run_on_controllers(lambda stc: stc.project.get_ports())
+
+        port_controllers: Dict[str, str] = {}
+        for controller, config_ports in controllers_ports.items():
+            for name in config_ports:
+                if name in port_controllers:
+                    raise TgnError(
+                        f'Configuration port "{name}" found on controllers {port_controllers[name]} and {controller}'
+                    )
+                port_controllers[name] = controller
+        job.ports = {name: port for config_ports in controllers_ports.values() for name, port in config_ports.items()}
+        job.config_loaded = True
+
+        for name, port in job.ports.items():
+            if name not in reservation_ports:
+                raise TgnError(f'Configuration port "{port}" not found in reservation ports {reservation_ports.keys()}')
+
+        def reserve_ports(stc: StcApp) -> None:
+            for name, port in controllers_ports[self._controller_of(stc)].items():
+                address = get_location(reservation_ports[name])
+                self.logger.debug(f"Logical Port {name} will be reserved on Physical location {address}")
+                if OFFLINE_PORT_MARKER not in reservation_ports[name].Name:
+                    port.reserve(address, force=True, wait_for_up=False)
+                else:
+                    self.logger.debug(f"Offline debug port {address} - no actual reservation")
+                job.reserved_ports.append(name)
+
+        self._run_on_controllers(reserve_ports)
+
+        self.logger.info("Port Reservation Completed")
+        self.config_files = config_files
+
+        if link_up_timeout > 0:
+            self._wait_for_link_up({name: job.ports[name] for name in job.reserved_ports}, link_up_timeout, job)
+        job.state = LoadConfigJob.COMPLETED
+
+    def _wait_for_link_up(self, ports: Dict[str, StcPort], timeout: int, job: LoadConfigJob) -> None:
+        """Wait until all ports are online and their link is up.
+
+        All ports are polled concurrently in a single polling loop, the poll interval doubles (up to
+        LINK_UP_MAX_POLL_INTERVAL) as long as some ports are still down. Offline debug ports are not polled.
+
+        :raises TgnError: if some ports are not up after timeout seconds, listing the ports and their states.
+        """
+
+        def get_port_state(port: StcPort) -> str:
+            if port.get_attribute("Online").lower() != "true":
+                return "OFFLINE"
+            return port.active_phy.get_attribute("LinkStatus")
+
+        pending = {name: port for name, port in ports.items() if port.active_phy}
+        deadline = time.time() + timeout
+        interval = LINK_UP_MIN_POLL_INTERVAL
+        with _command_executor(max(min(len(pending), LINK_UP_MAX_WORKERS), 1)) as executor:
+            while pending:
+                states = dict(zip(pending, executor.map(get_port_state, pending.values())))
+                job.ports_up.extend(name for name, state in states.items() if state.lower() == "up")
+                pending = {name: port for name, port in pending.items() if states[name].lower() != "up"}
+                if not pending:
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    down_states = {name: states[name] for name in pending}
+                    raise TgnError(f"Ports not up after {timeout} seconds - {down_states}")
+                time.sleep(min(interval, remaining))
+                interval = min(interval * 2, LINK_UP_MAX_POLL_INTERVAL)
+        self.logger.info("All reserved ports are up")
+
+    def _run_load_config_job(
+        self,
+        config_files: Dict[str, str],
+        reservation_ports: Dict[str, ReservedResourceInfo],
+        job: LoadConfigJob,
+        link_up_timeout: int,
+    ) -> None:
+        """Run load configuration in background thread, failures are reported through the job."""
+        try:
+            self._load_config(config_files, reservation_ports, job, link_up_timeout)
+        except Exception as error:  # pylint: disable=broad-except
+            self._fail_load_config_job(job, error)
+        finally:
+            self.project_access.release_exclusive()
+
+    def _start_load_config_job(self, link_up_timeout: int) -> LoadConfigJob:
+        """Acquire exclusive project access and create new load configuration job.
+
+        The access is held for the whole job run and must be released by the caller when the job ends.
+        """
+        if not self.project_access.acquire_exclusive():
+            if self.project_access.exclusive:
+                self._raise_load_config_job_running()
+            raise TgnError("Commands are still running on the loaded configuration - load configuration when they end")
+        self.load_config_job = LoadConfigJob(link_up_timeout > 0)
+        return self.load_config_job
+
+    def _fail_load_config_job(self, job: LoadConfigJob, error: Exception) -> None:
+        """Report load configuration job failure through the job."""
+        self.logger.exception(f"Load configuration job {job.job_id} failed")
+        job.error = str(error)
+        job.state = LoadConfigJob.FAILED
+
+    def _raise_load_config_job_running(self) -> None:
+        """Raise load configuration job is still running error."""
+        job_id = self.load_config_job.job_id if self.load_config_job else ""
+        raise TgnError(f"Load configuration job {job_id} is still running")
+
+    def _get_link_state(self, port: StcPort) -> str:
+        """Return port link state, N/A if the port is not reserved (offline debug) or the state can not be read."""
+        if not port.active_phy:
+            return "N/A"
+        try:
+            return port.active_phy.get_attribute("LinkStatus")
+        except Exception as error:  # pylint: disable=broad-except
+            self.logger.warning(f"Failed to read link state of port {port.name} - {error}")
+            return "N/A"
+
+    def _controller_of(self, stc: StcApp) -> str:
+        """Return the controller address of the requested StcApp."""
+        return [controller for controller, controller_stc in self.stcs.items() if controller_stc is stc][0]
+
+    def _run_on_controllers(self, operation: Callable[[StcApp], Any], pin_project: bool = False) -> Dict[str, Any]:
+        """Run operation concurrently on all controllers and return the results per controller.
+
+        :param operation: operation to run, gets StcApp as single argument.
+        :param pin_project: True - the operation depends on StcObject.project so serialize it under project_lock.
+        :raises TgnError: if the operation failed on some controllers, listing the failed controllers and their errors.
+            Broken barrier errors are secondary, controllers waiting on a barrier aborted by a failed controller, so they
+            are listed only if there are no other errors.
+        """
+
+        def run(stc: StcApp) -> Any:
+            if not pin_project:
+                return operation(stc)
+            with project_lock:
+                StcObject.project = stc.project
+                return operation(stc)
+
+        if len(self.stcs) == 1:
+            return {controller: run(stc) for controller, stc in self.stcs.items()}
+        with _command_executor(len(self.stcs)) as executor:
+            futures = {controller: executor.submit(run, stc) for controller, stc in self.stcs.items()}
+        errors = {controller: future.exception() for controller, future in futures.items() if future.exception()}
+        if errors:
+            primary_errors = {
+                controller: error
+                for controller, error in errors.items()
+                if not isinstance(error, threading.BrokenBarrierError)
+            }
+            errors = primary_errors or errors
+            errors_str = ", ".join(f"{controller} - {error!r}" for controller, error in errors.items())
+            raise TgnError(f"Operation failed on controllers {errors_str}") from next(iter(errors.values()))
+        return {controller: future.result() for controller, future in futures.items()}
+
+
+def _command_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Return thread pool whose workers are named after the calling command thread, so the profiler can track them."""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=threading.current_thread().name)
@@ -0,0 +1,123 @@
+"""
+On demand profiling of driver commands.
+
+Profiled commands run under cProfile and, in parallel, under a simple sampling profiler that records the stacks of the
+command thread and of the thread pool workers the command starts. Workers are recognized by name - ThreadPoolExecutor
+names them <thread_name_prefix>_<n> and the handler uses the command thread name as prefix. Threads the command starts
+in any other way are not sampled. Both profiles are attached to the sandbox:
+    <command>_<time>.pstats - cProfile statistics, load with pstats.Stats(file_name) or snakeviz.
+    <command>_<time>.collapsed - collapsed stacks (frame;frame;frame count), feed to flamegraph.pl or speedscope.
+"""
+import cProfile
+import logging
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from os import path
+from types import FrameType
+from typing import Any, Iterator, List, Optional
+
+from cloudshell.shell.core.driver_context import ResourceCommandContext
+from cloudshell.traffic.helpers import get_cs_session, get_reservation_id
+from cloudshell.traffic.rest_api_helpers import SandboxAttachments
+
+SAMPLING_INTERVAL = 0.005
+
+
+class CommandProfiler:
+    """Profile a block of code with cProfile and sampling profiler."""
+
+    def __init__(self, interval: Optional[float] = SAMPLING_INTERVAL) -> None:
+        """Create profilers, profiling starts when entering the context.
+
+        :param interval: sampling interval in seconds.
+        """
+        self.interval = interval
+        self.profile = cProfile.Profile()
+        self.samples: Counter = Counter()
+        self._command_thread: threading.Thread = None
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="CommandProfiler", daemon=True)
+
+    def __enter__(self) -> "CommandProfiler":
+        """Start profiling."""
+        self._command_thread = threading.current_thread()
+        self._sampler.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Stop profiling."""
+        self.profile.disable()
+        self._stop.set()
+        self._sampler.join()
+
+    def pstats(self) -> bytes:
+        """Return cProfile statistics in pstats file format."""
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)  # type: ignore[attr-defined]
+
+    def collapsed_stacks(self) -> str:
+        """Return sampled stacks in collapsed stack format."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def _sample(self) -> None:
+        """Sample the stacks of the command thread and its workers until stopped."""
+        workers_prefix = f"{self._command_thread.name}_"
+        while not self._stop.wait(self.interval):
+            profiled_threads = {
+                thread.ident
+                for thread in threading.enumerate()
+                if thread is self._command_thread or thread.name.startswith(workers_prefix)
+            }
+            for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if thread_id in profiled_threads:
+                    self.samples[_collapse_stack(frame)] += 1
+
+
+@contextmanager
+def profile_command(
+    context: ResourceCommandContext, logger: logging.Logger, command: str, profiled_commands: List[str]
+) -> Iterator[None]:
+    """Profile the command block if the command is in profiled_commands and attach the profiles to reservation."""
+    if command not in profiled_commands:
+        yield
+        return
+    profiler = CommandProfiler()
+    try:
+        with profiler:
+            yield
+    finally:
+        attach_profile(context, logger, command, profiler)
+
+
+def attach_profile(context: ResourceCommandContext, logger: logging.Logger, command: str, profiler: CommandProfiler) -> None:
+    """Attach command profiles to reservation.
+
+    Profiling must never fail the profiled command so attachment errors are only logged.
+    """
+    try:
+        quali_api_helper = SandboxAttachments(
+            context.connectivity.server_address, context.connectivity.admin_auth_token, logger
+        )
+        quali_api_helper.login()
+        file_name = command + "_" + time.ctime().replace(" ", "_").replace(":", "_")
+        for suffix, data in (("pstats", profiler.pstats()), ("collapsed", profiler.collapsed_stacks())):
+            quali_api_helper.attach_new_file(get_reservation_id(context), file_data=data, file_name=f"{file_name}.{suffix}")
+        get_cs_session(context).WriteMessageToReservationOutput(
+            get_reservation_id(context), f"{command} profile saved in attached files - {file_name}.pstats/collapsed"
+        )
+    except Exception as error:  # pylint: disable=broad-except
+        logger.warning(f"Failed to attach {command} profile - {error}")
+
+
+def _collapse_stack(frame: Optional[FrameType]) -> str:
+    """Return frame stack as semicolon separated list of module:function, outermost frame first."""
+    stack = []
+    while frame:
+        stack.append(f"{path.splitext(path.basename(frame.f_code.co_filename))[0]}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
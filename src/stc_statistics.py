@@ -0,0 +1,170 @@
+"""
+Serialize STC statistics to the output types supported by the get_statistics command.
+
+Statistics are represented as an ordered dictionary {object name: {statistic name: value}}, as built by the handler from
+StcStats.statistics.
+
+The columnar output type uses Arrow IPC (file format) if pyarrow is installed. Otherwise, it falls back to a simple,
+dependency-free, gzip compressed binary format:
+    magic (8 bytes) | header length (4 bytes, little endian) | JSON header | column 1 | column 2 | ...
+The header is {"rows": <number of rows>, "columns": [{"name": <statistic name>, "type": <int64|float64|utf8>}, ...]}.
+int64 and float64 columns are packed little endian arrays, utf8 columns are sequences of <length (4 bytes)><utf-8 bytes>.
+"""
+import csv
+import gzip
+import io
+import json
+import struct
+from array import array
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+COLUMNAR_MAGIC = b"STCCOL1\n"
+
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+
+def stats_to_csv(statistics: OrderedDict) -> str:
+    """Return statistics as CSV text, one row per object."""
+    captions = list(list(statistics.values())[0].keys())
+    output = io.StringIO()
+    writer = csv.DictWriter(output, captions)
+    writer.writeheader()
+    for obj_values in statistics.values():
+        writer.writerow(obj_values)
+    return output.getvalue().strip()
+
+
+def stats_to_csv_gz(statistics: OrderedDict) -> bytes:
+    """Return statistics as gzip compressed CSV."""
+    return gzip.compress(stats_to_csv(statistics).encode("utf-8"))
+
+
+def stats_to_columnar(statistics: OrderedDict) -> Tuple[bytes, str]:
+    """Return statistics in columnar binary format and the matching file suffix.
+
+    :return: (Arrow IPC file, "arrow") if pyarrow is installed, else (built-in columnar format, "stcc.gz").
+    """
+    columns = _stats_to_columns(statistics)
+    if pyarrow:
+        return _columns_to_arrow(columns), "arrow"
+    return _columns_to_stcc(columns), "stcc.gz"
+
+
+def read_columnar(data: bytes) -> Dict[str, list]:
+    """Read statistics from built-in columnar format into ordered dictionary {statistic name: list of values}."""
+    payload = gzip.decompress(data)
+    if not payload.startswith(COLUMNAR_MAGIC):
+        raise ValueError("Data is not in STC columnar format")
+    offset = len(COLUMNAR_MAGIC)
+    (header_length,) = struct.unpack_from("<I", payload, offset)
+    offset += 4
+    header_end = offset + header_length
+    header = json.loads(payload[offset:header_end].decode("utf-8"))
+    offset = header_end
+    rows = header["rows"]
+    columns: Dict[str, list] = OrderedDict()
+    for column in header["columns"]:
+        if column["type"] in ("int64", "float64"):
+            values = array("q" if column["type"] == "int64" else "d")
+            column_end = offset + rows * values.itemsize
+            values.frombytes(payload[offset:column_end])
+            offset = column_end
+            columns[column["name"]] = values.tolist()
+        else:
+            strings: list = []
+            for _ in range(rows):
+                (length,) = struct.unpack_from("<I", payload, offset)
+                offset += 4
+                value_end = offset + length
+                strings.append(payload[offset:value_end].decode("utf-8"))
+                offset = value_end
+            columns[column["name"]] = strings
+    return columns
+
+
+#
+# Private functions.
+#
+
+
+def _stats_to_columns(statistics: OrderedDict) -> OrderedDict:
+    """Transpose statistics into ordered dictionary {statistic name: (column type, list of values)}.
+
+    StcStats converts only integer statistics, so numeric strings (rates, latencies etc.) are converted here and the
+    column is typed by the converted values. utf8 columns keep the original values.
+    """
+    captions = list(list(statistics.values())[0].keys())
+    columns = OrderedDict()
+    for caption in captions:
+        values = [obj_values.get(caption, "") for obj_values in statistics.values()]
+        numbers = [_to_number(value) for value in values]
+        column_type = _column_type(numbers)
+        columns[caption] = (column_type, values if column_type == "utf8" else numbers)
+    return columns
+
+
+def _to_number(value: object) -> object:
+    """Return string value converted to int or float if possible, else the value itself."""
+    if not isinstance(value, str):
+        return value
+    for number_type in (int, float):
+        try:
+            return number_type(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _column_type(values: list) -> str:
+    """Return the narrowest column type that can hold all values."""
+    if all(isinstance(value, int) and not isinstance(value, bool) and INT64_MIN <= value <= INT64_MAX for value in values):
+        return "int64"
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return "float64"
+    return "utf8"
+
+
+def _columns_to_stcc(columns: OrderedDict) -> bytes:
+    """Serialize columns to built-in columnar format."""
+    rows = len(next(iter(columns.values()))[1])
+    header = {"rows": rows, "columns": [{"name": name, "type": column_type} for name, (column_type, _) in columns.items()]}
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    output = io.BytesIO()
+    output.write(COLUMNAR_MAGIC)
+    output.write(struct.pack("<I", len(header_bytes)))
+    output.write(header_bytes)
+    for column_type, values in columns.values():
+        if column_type == "int64":
+            output.write(array("q", values).tobytes())
+        elif column_type == "float64":
+            output.write(array("d", values).tobytes())
+        else:
+            for value in values:
+                value_bytes = str(value).encode("utf-8")
+                output.write(struct.pack("<I", len(value_bytes)))
+                output.write(value_bytes)
+    return gzip.compress(output.getvalue())
+
+
+def _columns_to_arrow(columns: OrderedDict) -> bytes:
+    """Serialize columns to Arrow IPC file."""
+    arrow_types = {"int64": pyarrow.int64(), "float64": pyarrow.float64(), "utf8": pyarrow.string()}
+    arrays = []
+    for column_type, values in columns.values():
+        if column_type == "utf8":
+            values = [str(value) for value in values]
+        arrays.append(pyarrow.array(values, type=arrow_types[column_type]))
+    table = pyarrow.Table.from_arrays(arrays, names=list(columns.keys()))
+    compression = "zstd" if pyarrow.Codec.is_available("zstd") else None
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_file(sink, table.schema, options=pyarrow.ipc.IpcWriteOptions(compression=compression)) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,129 @@
+"""
+Test configuration delta reading, validation and resolution. These tests do not require CloudShell or STC.
+"""
+# pylint: disable=redefined-outer-name
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from trafficgenerator.tgn_utils import TgnError
+
+from src import stc_config_delta
+from src.stc_config_delta import read_config_delta, resolve_delta, validate_delta
+
+
+class FakeApi:
+    """Minimal STC REST API - get only, over {handle: {attribute: value}}."""
+
+    def __init__(self, objects: dict) -> None:
+        """Create API over the requested objects."""
+        self.objects = objects
+
+    def get(self, handle: str, attribute: str) -> Any:
+        """Return object attribute, KeyError for unknown objects as STC errors on unknown handles."""
+        return self.objects[handle].get(attribute, "")
+
+
+@pytest.fixture()
+def stc() -> SimpleNamespace:
+    """Yield fake StcApp with a project with two ports and one stream block."""
+    objects = {
+        "project1": {"Name": "Project 1", "children-port": "port1 port2"},
+        "port1": {"Name": "Port 1", "parent": "project1", "children-streamblock": "streamblock1"},
+        "port2": {"Name": "Port 2 (offline)", "parent": "project1", "children-streamblock": ""},
+        "streamblock1": {"Name": "Bound SB", "parent": "port1"},
+    }
+    return SimpleNamespace(project=SimpleNamespace(ref="project1"), api=FakeApi(objects))
+
+
+def delta(**operations: list) -> dict:
+    """Return normalized delta with the requested operations."""
+    return {"base": "", "delete": [], "create": [], "modify": [], **operations}
+
+
+def test_path_elements() -> None:
+    """Test object path split into (type, name) elements."""
+    assert stc_config_delta._path_elements("") == []  # pylint: disable=protected-access
+    assert stc_config_delta._path_elements("Port:Port 1/streamblock:A:B") == [  # pylint: disable=protected-access
+        ("port", "Port 1"),
+        ("streamblock", "A:B"),
+    ]
+    assert stc_config_delta._path_elements("/port2/") == [("", "port2")]  # pylint: disable=protected-access
+
+
+def test_read_config_delta() -> None:
+    """Test JSON and XML delta files are read into the same normalized delta."""
+    json_delta = read_config_delta(Path(__file__).parent.joinpath("test_config_delta.json").as_posix())
+    assert json_delta == {
+        "base": "test_config.xml",
+        "delete": [],
+        "create": [{"type": "streamblock", "under": "port:Port 2", "attributes": {"Name": "Delta SB"}}],
+        "modify": [{"object": "port:Port 1/streamblock:Bound SB", "attributes": {"FixedFrameLength": "256"}}],
+    }
+    xml_delta = read_config_delta(Path(__file__).parent.joinpath("test_config_delta.xml").as_posix())
+    assert xml_delta == {
+        "base": "test_config.xml",
+        "delete": ["port:Port 2/streamblock:Delta SB"],
+        "create": [],
+        "modify": [{"object": "port:Port 1/streamblock:Bound SB", "attributes": {"FixedFrameLength": "128"}}],
+    }
+    with pytest.raises(TgnError):
+        read_config_delta("delta.txt")
+
+
+def test_read_xml_delta(tmp_path: Path) -> None:
+    """Test XML delta create elements and unknown operations."""
+    delta_file = tmp_path.joinpath("delta.xml")
+    delta_file.write_text('<delta><create type="streamblock" under="port:Port 1" Name="New SB" /></delta>')
+    xml_delta = stc_config_delta._read_xml_delta(delta_file.as_posix())  # pylint: disable=protected-access
+    assert xml_delta["create"] == [{"type": "streamblock", "under": "port:Port 1", "attributes": {"Name": "New SB"}}]
+    delta_file.write_text('<delta><rename object="port:Port 1" /></delta>')
+    with pytest.raises(TgnError):
+        stc_config_delta._read_xml_delta(delta_file.as_posix())  # pylint: disable=protected-access
+
+
+def test_validate_delta() -> None:
+    """Test that delta paths can not delete or create ports or the project."""
+    validate_delta(delta(delete=["port:Port 1/streamblock:Bound SB"]))
+    for object_path in ("", "port:Port 1"):
+        with pytest.raises(TgnError):
+            validate_delta(delta(delete=[object_path]))
+    with pytest.raises(TgnError):
+        validate_delta(delta(create=[{"type": "Port", "under": "", "attributes": {}}]))
+
+
+def test_validate_delta_deleted_objects() -> None:
+    """Test that delta can not delete again, create under or modify objects it deletes."""
+    deleted = "port:Port 1/streamblock:A"
+    validate_delta(delta(delete=["port:Port 1/streamblock:A/framelengthdistribution:B", deleted]))
+    validate_delta(delta(delete=[deleted], modify=[{"object": "port:Port 1/streamblock:AB"}]))
+    for operations in (
+        {"delete": [deleted, "Port:Port 1/streamblock:A/"]},
+        {"delete": [deleted, f"{deleted}/framelengthdistribution:B"]},
+        {"delete": [deleted], "create": [{"type": "framelengthdistribution", "under": deleted, "attributes": {}}]},
+        {"delete": [deleted], "modify": [{"object": f"{deleted}/framelengthdistribution:B"}]},
+    ):
+        with pytest.raises(TgnError):
+            validate_delta(delta(**operations))
+
+
+def test_resolve_delta(stc: SimpleNamespace) -> None:
+    """Test path resolution by name and by handle, and that ports and project can not be deleted by handle."""
+    handles = resolve_delta(
+        stc,
+        delta(
+            delete=["port:Port 1/streamblock:Bound SB", "port:Port 1/streamblock:No SB"], modify=[{"object": "port:Port 2"}]
+        ),
+    )
+    assert handles == {"port:Port 1/streamblock:Bound SB": "streamblock1", "port:Port 2": "port2"}
+    assert resolve_delta(stc, delta(delete=["port1/streamblock1"])) == {"port1/streamblock1": "streamblock1"}
+    for object_path in ("port2", "project1"):
+        validate_delta(delta(delete=[object_path]))
+        with pytest.raises(TgnError):
+            resolve_delta(stc, delta(delete=[object_path]))
+    with pytest.raises(TgnError):
+        resolve_delta(stc, delta(delete=["port:Port 1/streamblock:Bound SB"], modify=[{"object": "streamblock1"}]))
+    with pytest.raises(TgnError):
+        resolve_delta(stc, delta(delete=["streamblock1"], create=[{"type": "rangemodifier", "under": "port1/streamblock1"}]))
+    resolve_delta(stc, delta(delete=["streamblock1"], modify=[{"object": "port1"}]))
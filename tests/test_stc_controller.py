@@ -2,6 +2,8 @@
 Test StcControllerShell2GDriver.
 """
 # pylint: disable=redefined-outer-name
+import base64
+import gzip
 import json
 import os
 import time
@@ -19,6 +21,7 @@ from shellfoundry_traffic.test_helpers import TestHelpers, session, skip_if_offl
 from trafficgenerator.tgn_utils import TgnError
 
 from src.stc_driver import StcControllerShell2GDriver
+from src.stc_statistics import read_columnar
 
 SERVER_511 = "localhost:9090"
 PORTS_511 = ["stc offline-debug/Module1/PG1/Port1", "stc offline-debug/Module1/PG1/Port2"]
@@ -90,6 +93,44 @@ class TestStcControllerDriver:
         """Test load_config command."""
         config_file = Path(__file__).parent.joinpath("test_config.xml")
         self._load_config(driver, context, config_file)
+        driver.load_config(context, config_file.as_posix(), link_up_timeout="30")
+
+    def test_load_config_async(self, driver: StcControllerShell2GDriver, context: ResourceCommandContext) -> None:
+        """Test load_config_async and get_load_config_progress commands."""
+        config_file = Path(__file__).parent.joinpath("test_config.xml")
+        job_id = driver.load_config_async(context, config_file.as_posix())
+        with pytest.raises(TgnError):
+            driver.load_config_async(context, config_file.as_posix())
+        with pytest.raises(TgnError):
+            self._load_config(driver, context, config_file)
+        with pytest.raises(TgnError):
+            driver.send_arp(context)
+        deadline = time.time() + 300
+        progress = driver.get_load_config_progress(context, job_id)
+        while progress["state"] == "running":
+            if time.time() > deadline:
+                pytest.fail(f"Load configuration job {job_id} did not end in 300 seconds - {progress}")
+            time.sleep(1)
+            progress = driver.get_load_config_progress(context, job_id)
+        assert progress["state"] == "completed"
+        assert progress["config_loaded"]
+        assert progress["ports_reserved"] == progress["ports_total"] == 2
+        assert progress["ports_up"] is None
+        with pytest.raises(TgnError):
+            driver.get_load_config_progress(context, "no-such-job")
+
+    def test_apply_config_delta(self, driver: StcControllerShell2GDriver, context: ResourceCommandContext) -> None:
+        """Test apply_config_delta command."""
+        with pytest.raises(TgnError):
+            driver.apply_config_delta(context, Path(__file__).parent.joinpath("test_config_delta.json").as_posix())
+        self._load_config(driver, context, Path(__file__).parent.joinpath("test_config.xml"))
+        project = driver.get_children(context, "system1", "project")[0]
+        port_2 = driver.get_children(context, project, "port")[1]
+        num_stream_blocks = len(driver.get_children(context, port_2, "streamblock"))
+        driver.apply_config_delta(context, Path(__file__).parent.joinpath("test_config_delta.json").as_posix())
+        assert len(driver.get_children(context, port_2, "streamblock")) == num_stream_blocks + 1
+        driver.apply_config_delta(context, Path(__file__).parent.joinpath("test_config_delta.xml").as_posix())
+        assert len(driver.get_children(context, port_2, "streamblock")) == num_stream_blocks
 
     def test_hidden_commands(self, driver: StcControllerShell2GDriver, context: ResourceCommandContext) -> None:
         """Test hidden commands."""
@@ -103,6 +144,14 @@ class TestStcControllerDriver:
         assert new_attributes["RouterId"] != old_attributes["RouterId"]
         assert new_attributes["RouterId"] == "1.2.3.4"
 
+    def test_profiling(self, driver: StcControllerShell2GDriver, context: ResourceCommandContext) -> None:
+        """Test profiling hidden command."""
+        assert driver.set_profiling(context, "load_config") == ["load_config"]
+        self._load_config(driver, context, Path(__file__).parent.joinpath("test_config.xml"))
+        assert driver.set_profiling(context, "") == []
+        with pytest.raises(TgnError):
+            driver.set_profiling(context, "get_session_id")
+
     @pytest.mark.usefixtures("skip_if_offline")
     def test_run_traffic(self, driver: StcControllerShell2GDriver, context: ResourceCommandContext) -> None:
         """Test traffic commands."""
@@ -118,6 +167,15 @@ class TestStcControllerDriver:
         stats = driver.get_statistics(context, "generatorportresults", "JSON")
         assert int(stats["Port 1"]["TotalFrameCount"]) >= 4000
         driver.get_statistics(context, "generatorportresults", "csv")
+        csv_gz = driver.get_statistics(context, "generatorportresults", "csv.gz")
+        assert "TotalFrameCount" in gzip.decompress(base64.b64decode(csv_gz)).decode("utf-8")
+        columnar = base64.b64decode(driver.get_statistics(context, "generatorportresults", "columnar"))
+        if columnar.startswith(b"ARROW1"):
+            pyarrow = pytest.importorskip("pyarrow")
+            total_frame_count = pyarrow.ipc.open_file(pyarrow.py_buffer(columnar)).read_all().column("TotalFrameCount")
+            assert min(total_frame_count.to_pylist()) >= 4000
+        else:
+            assert min(read_columnar(columnar)["TotalFrameCount"]) >= 4000
 
     @pytest.mark.usefixtures("skip_if_offline")
     def test_run_sequencer(self, driver: StcControllerShell2GDriver, context: ResourceCommandContext) -> None:
@@ -0,0 +1,56 @@
+"""
+Test statistics serialization. These tests do not require CloudShell or STC.
+"""
+# pylint: disable=redefined-outer-name
+import gzip
+from collections import OrderedDict
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from src import stc_statistics
+from src.stc_statistics import read_columnar, stats_to_columnar, stats_to_csv, stats_to_csv_gz
+
+
+@pytest.fixture()
+def statistics() -> OrderedDict:
+    """Yield statistics as built by the handler from StcStats - integers converted, floats left as strings."""
+    return OrderedDict(
+        [
+            ("Port 1", {"topLevelName": "Port 1", "TotalFrameCount": 4000, "L1BitRate": "12.5", "State": "RUNNING"}),
+            ("Port 2", {"topLevelName": "Port 2", "TotalFrameCount": 2000, "L1BitRate": "7", "State": "STOPPED"}),
+        ]
+    )
+
+
+def test_csv_gz(statistics: OrderedDict) -> None:
+    """Test that gzip compressed CSV decompresses to the plain CSV."""
+    assert gzip.decompress(stats_to_csv_gz(statistics)).decode("utf-8") == stats_to_csv(statistics)
+
+
+def test_columnar_builtin(statistics: OrderedDict, monkeypatch: MonkeyPatch) -> None:
+    """Test built-in columnar format round trip and column types."""
+    monkeypatch.setattr(stc_statistics, "pyarrow", None)
+    data, suffix = stats_to_columnar(statistics)
+    assert suffix == "stcc.gz"
+    columns = read_columnar(data)
+    assert columns["topLevelName"] == ["Port 1", "Port 2"]
+    assert columns["TotalFrameCount"] == [4000, 2000]
+    assert all(isinstance(value, int) for value in columns["TotalFrameCount"])
+    assert columns["L1BitRate"] == [12.5, 7.0]
+    assert all(isinstance(value, float) for value in columns["L1BitRate"])
+    assert columns["State"] == ["RUNNING", "STOPPED"]
+
+
+def test_columnar_arrow(statistics: OrderedDict) -> None:
+    """Test Arrow IPC round trip and column types."""
+    pyarrow = pytest.importorskip("pyarrow")
+    data, suffix = stats_to_columnar(statistics)
+    assert suffix == "arrow"
+    table = pyarrow.ipc.open_file(pyarrow.py_buffer(data)).read_all()
+    assert table.schema.field("TotalFrameCount").type == pyarrow.int64()
+    assert table.schema.field("L1BitRate").type == pyarrow.float64()
+    assert table.schema.field("State").type == pyarrow.string()
+    assert table.column("TotalFrameCount").to_pylist() == [4000, 2000]
+    assert table.column("L1BitRate").to_pylist() == [12.5, 7.0]
+    assert table.column("topLevelName").to_pylist() == ["Port 1", "Port 2"]